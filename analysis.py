@@ -0,0 +1,187 @@
+# -*- encoding: utf-8 -*-
+"""
+Linear time structural analysis over graph.Graph: connected components,
+strongly connected components and topological order.
+
+Every result is given by vertex position in graph.vertexes, with component ids
+packed in arrays numbered from 0 in the order their first vertex appears.
+
+:author: Andre Filliettaz
+:email: andrentaz@gmail.com
+:github: https://github.com/andrentaz
+"""
+from __future__ import absolute_import, unicode_literals
+
+from array import array
+
+from helpers import Queue, UnionFind
+
+
+def vertex_indexes(graph):
+    """Map every Vertex in the graph to its position in graph.vertexes"""
+    return {vertex: idx for idx, vertex in enumerate(graph.vertexes)}
+
+
+def _compact_ids(roots):
+    """Renumber representative ids to 0..k-1 keeping the first seen order"""
+    ids = array('l', roots)
+    renumber = {}
+    for idx, root in enumerate(ids):
+        ids[idx] = renumber.setdefault(root, len(renumber))
+
+    return ids
+
+
+def connected_components(graph):
+    """
+    Find the connected components of the graph with a UnionFind over every
+    edge. The edge direction is ignored, so in a digraph these are the weakly
+    connected components.
+
+    :param graph: Graph to be analysed
+    :return: array with the component id of each vertex
+    """
+    indexes = vertex_indexes(graph)
+    sets = UnionFind(len(graph.vertexes))
+
+    for idx, vertex in enumerate(graph.vertexes):
+        for edge in vertex.edges:
+            sets.union(idx, indexes[edge.neighboor])
+
+    return _compact_ids(sets.find(idx) for idx in range(len(sets)))
+
+
+def strongly_connected_components(graph):
+    """
+    Find the strongly connected components of the graph with an iterative
+    version of Tarjan's algorithm, so deep graphs don't hit the recursion
+    limit.
+
+    :param graph: Graph to be analysed
+    :return: array with the component id of each vertex
+    """
+    indexes = vertex_indexes(graph)
+    vertexes = graph.vertexes
+    size = len(vertexes)
+
+    unvisited = -1
+    order = array('l', [unvisited]) * size
+    lowlink = array('l', [0]) * size
+    on_stack = bytearray(size)
+    roots = array('l', [0]) * size
+    stack = []
+    counter = 0
+
+    for start in range(size):
+        if order[start] != unvisited:
+            continue
+
+        # each call frame keeps the node and the next edge to be explored
+        calls = [(start, 0)]
+        order[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack[start] = 1
+
+        while calls:
+            node, edge_idx = calls[-1]
+            edges = vertexes[node].edges
+
+            if edge_idx < len(edges):
+                calls[-1] = (node, edge_idx + 1)
+                neighboor = indexes[edges[edge_idx].neighboor]
+
+                if order[neighboor] == unvisited:
+                    order[neighboor] = lowlink[neighboor] = counter
+                    counter += 1
+                    stack.append(neighboor)
+                    on_stack[neighboor] = 1
+                    calls.append((neighboor, 0))
+                elif on_stack[neighboor]:
+                    lowlink[node] = min(lowlink[node], order[neighboor])
+
+                continue
+
+            # every edge explored, return to the caller
+            calls.pop()
+            if calls:
+                caller = calls[-1][0]
+                lowlink[caller] = min(lowlink[caller], lowlink[node])
+
+            # node is the root of a component, pop it from the stack
+            if lowlink[node] == order[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    roots[member] = node
+                    if member == node:
+                        break
+
+    return _compact_ids(roots)
+
+
+def topological_sort(graph):
+    """
+    Sort the vertexes of a digraph so every edge goes from an earlier vertex
+    to a later one, using Kahn's algorithm.
+
+    :param graph: Graph to be sorted, must be a digraph without cycles
+    :return: list with the vertexes in topological order
+    """
+    if not graph.digraph:
+        raise ValueError('Topological order is only defined for digraphs')
+
+    indexes = vertex_indexes(graph)
+    in_degree = array('l', [0]) * len(graph.vertexes)
+
+    for vertex in graph.vertexes:
+        for edge in vertex.edges:
+            in_degree[indexes[edge.neighboor]] += 1
+
+    sources = Queue([v for v in graph.vertexes if in_degree[indexes[v]] == 0])
+    ordered = []
+
+    while len(sources) > 0:
+        node = sources.pop()
+        ordered.append(node)
+
+        for edge in node.edges:
+            neighboor_idx = indexes[edge.neighboor]
+            in_degree[neighboor_idx] -= 1
+            if in_degree[neighboor_idx] == 0:
+                sources.add(edge.neighboor)
+
+    if len(ordered) != len(graph.vertexes):
+        raise ValueError('The graph has cycles, no topological order exists')
+
+    return ordered
+
+
+class Components(object):
+    """
+    Component ids of a graph indexed by Vertex, to reject unreachable pairs in
+    O(1) before running any search.
+    """
+    def __init__(self, graph):
+        super(Components, self).__init__()
+        self.indexes = vertex_indexes(graph)
+        self.ids = connected_components(graph)
+        self.count = max(self.ids) + 1 if self.ids else 0
+
+    def __repr__(self):
+        return (
+            'Components(vertexes={}, '
+            'count={})'
+        ).format(len(self.ids), self.count)
+
+    def component(self, vertex):
+        """Get the component id of the vertex"""
+        return self.ids[self.indexes[vertex]]
+
+    def may_reach(self, start, end):
+        """
+        Check if there may be a path from start to end. A False answer is
+        final, while on digraphs a True one still depends on the direction of
+        the edges.
+        """
+        return self.component(start) == self.component(end)
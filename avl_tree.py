@@ -3,6 +3,8 @@ class TreeNode(object):
     """
     Simple implementation of a Tree Node
     """
+    __slots__ = ('key', 'left', 'right', 'height')
+
     def __init__(self, key):
         super(TreeNode, self).__init__()
         self.key = key
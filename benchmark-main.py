@@ -0,0 +1,98 @@
+# -*- encoding: utf-8 -*-
+"""
+This is a simple driver program to compare the heap based dijkstra algorithm
+with the bucket based algorithms from the compact module over random graphs
+with integer weights. All of them run over the same CompactGraph, so only the
+priority queue differs between them.
+
+The bucket algorithms need fewer comparisons as long as the max weight is small
+next to the number of vertexes, and Dial's circular array of max weight + 1
+buckets stops paying off as the max weight grows, so every algorithm runs over
+the same graph for a range of max weights.
+"""
+import argparse
+import random
+import time
+
+from compact import CompactGraph, delta_stepping, dial, dijkstra
+from graph import Graph, Vertex
+
+
+def random_graph(vertexes, degree, max_weight, seed):
+    """Create a connected random undirected graph with integer weights"""
+    rand = random.Random(seed)
+    graph = Graph()
+    graph.vertexes = [Vertex(str(i)) for i in range(vertexes)]
+
+    # a random spanning path keeps the whole graph reachable
+    for idx in range(1, vertexes):
+        graph.add_edge(graph.vertexes[rand.randrange(idx)], graph.vertexes[idx],
+                       rand.randint(1, max_weight))
+
+    for _ in range(vertexes * (degree - 1)):
+        graph.add_edge(graph.vertexes[rand.randrange(vertexes)],
+                       graph.vertexes[rand.randrange(vertexes)],
+                       rand.randint(1, max_weight))
+
+    return graph
+
+
+def timed(function, *args):
+    """Run the function and give how long it took in seconds"""
+    begin = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - begin
+
+
+def main(vertexes, degree, max_weights, seed):
+    """Time every algorithm from vertex 0 for each max weight"""
+    print()
+    print('Vertexes: {}, Degree: {}'.format(vertexes, degree))
+    print('{:>12} {:>12} {:>12} {:>12}'.format(
+        'max weight', 'dijkstra', 'dial', 'delta'))
+
+    for max_weight in max_weights:
+        graph = random_graph(vertexes, degree, max_weight, seed)
+        compact = CompactGraph.from_graph(graph)
+
+        heap_time = timed(dijkstra, compact, 0)
+        dial_time = timed(dial, compact, 0)
+        delta_time = timed(delta_stepping, compact, 0)
+
+        print('{:>12} {:>11.4f}s {:>11.4f}s {:>11.4f}s'.format(
+            max_weight, heap_time, dial_time, delta_time))
+
+    print()
+
+
+if __name__ == '__main__':
+    # handle script arguments
+    parser = argparse.ArgumentParser(
+        description='Compare heap and bucket based shortest paths.'
+    )
+    parser.add_argument('--vertexes',
+                        help='number of vertexes in the random graphs',
+                        type=int,
+                        default=2000)
+    parser.add_argument('--degree',
+                        help='average number of edges per vertex',
+                        type=int,
+                        default=4)
+    parser.add_argument('--max-weights',
+                        help='max edge weights to be compared',
+                        type=int,
+                        nargs='+',
+                        default=[1, 10, 100, 10000, 1000000])
+    parser.add_argument('--seed',
+                        help='seed for the random graphs',
+                        type=int,
+                        default=0)
+    args = parser.parse_args()
+
+    # call main function
+    main(
+        vertexes=args.vertexes,
+        degree=args.degree,
+        max_weights=args.max_weights,
+        seed=args.seed,
+    )
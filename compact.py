@@ -0,0 +1,576 @@
+# -*- encoding: utf-8 -*-
+"""
+A compact representation of graphs using flat typed arrays in the compressed
+sparse row layout, and the searches that run over it.
+
+The edges leaving vertex v are the positions offsets[v] to offsets[v + 1] in
+the targets and weights arrays. Vertexes are plain integers, so there is no
+per vertex object and searches keep their state in arrays of their own.
+
+:author: Andre Filliettaz
+:email: andrentaz@gmail.com
+:github: https://github.com/andrentaz
+"""
+from __future__ import absolute_import, unicode_literals
+
+import heapq
+from array import array
+
+from analysis import vertex_indexes
+from graph import Graph, Vertex
+
+UNREACHED = -1
+
+
+def _weights_typecode(weights):
+    """Keep integer weights as integers, so bucket based searches apply"""
+    if all(isinstance(w, int) for w in weights):
+        return 'l'
+
+    return 'd'
+
+
+class CompactGraph(object):
+    """Implements an abstraction to Graphs using compressed sparse rows"""
+    def __init__(self, offsets, targets, weights, digraph=False):
+        super(CompactGraph, self).__init__()
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.digraph = digraph
+        self._reverse = None
+
+    def __repr__(self):
+        return (
+            'CompactGraph(vertexes={}, '
+            'edges={}, '
+            'digraph={})'
+        ).format(len(self), len(self.targets), self.digraph)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Create a compact copy of a graph.Graph, keeping vertex positions"""
+        indexes = vertex_indexes(graph)
+        offsets = array('l', [0])
+        targets = array('l')
+        weights = []
+
+        for vertex in graph.vertexes:
+            for edge in vertex.edges:
+                targets.append(indexes[edge.neighboor])
+                weights.append(edge.distance)
+
+            offsets.append(len(targets))
+
+        weights = array(_weights_typecode(weights), weights)
+        return cls(offsets, targets, weights, digraph=graph.digraph)
+
+    def to_graph(self):
+        """Create a graph.Graph with the same vertexes and edges"""
+        graph = Graph()
+        graph.digraph = self.digraph
+        graph.vertexes = [Vertex(str(i)) for i in range(len(self))]
+
+        for v_from, vertex in enumerate(graph.vertexes):
+            for idx in range(self.offsets[v_from], self.offsets[v_from + 1]):
+                vertex.add_edge(graph.vertexes[self.targets[idx]],
+                                self.weights[idx])
+
+        return graph
+
+    def degree(self, v):
+        """Number of edges leaving v"""
+        return self.offsets[v + 1] - self.offsets[v]
+
+    def neighboors(self, v):
+        """Give the array slice with the vertexes reached from v"""
+        return self.targets[self.offsets[v]:self.offsets[v + 1]]
+
+    def edges(self, v):
+        """Give (neighboor, weight) pairs for the edges leaving v"""
+        start = self.offsets[v]
+        end = self.offsets[v + 1]
+        return zip(self.targets[start:end], self.weights[start:end])
+
+    def reverse(self):
+        """
+        Get the graph with every edge reversed, built once and cached. An
+        undirected graph is its own reverse.
+        """
+        if not self.digraph:
+            return self
+
+        if self._reverse is None:
+            size = len(self)
+            offsets = array('l', [0]) * (size + 1)
+            for target in self.targets:
+                offsets[target + 1] += 1
+
+            for v in range(size):
+                offsets[v + 1] += offsets[v]
+
+            # place each edge in the next free slot of its target row
+            cursor = array('l', offsets[:-1])
+            targets = array('l', [0]) * len(self.targets)
+            weights = array(self.weights.typecode, self.weights)
+            for v_from in range(size):
+                for idx in range(self.offsets[v_from], self.offsets[v_from + 1]):
+                    v_to = self.targets[idx]
+                    targets[cursor[v_to]] = v_from
+                    weights[cursor[v_to]] = self.weights[idx]
+                    cursor[v_to] += 1
+
+            self._reverse = CompactGraph(offsets, targets, weights, digraph=True)
+            self._reverse._reverse = self
+
+        return self._reverse
+
+
+def as_compact(graph):
+    """Give the graph as a CompactGraph, converting a graph.Graph if needed"""
+    if isinstance(graph, CompactGraph):
+        return graph
+
+    return CompactGraph.from_graph(graph)
+
+
+# state shared with the worker processes, set up by _init_worker
+_worker = {}
+
+
+def _init_worker(state):
+    """Keep the graph and the shared search arrays in the worker process"""
+    _worker.update(state)
+
+
+# ------------------------------------------------------------------------------
+# Level Synchronous BFS --------------------------------------------------------
+# ------------------------------------------------------------------------------
+def _top_down(graph, visited, frontier):
+    """
+    Expand a batch of frontier vertexes.
+
+    :return: flat array of (child, parent) pairs for the unvisited children
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    found = array('l')
+
+    for v in frontier:
+        for child in targets[offsets[v]:offsets[v + 1]]:
+            if not visited[child]:
+                found.append(child)
+                found.append(v)
+
+    return found
+
+
+def _bottom_up(reverse, visited, in_frontier, start, end):
+    """
+    Look for a frontier parent for each unvisited vertex in start..end-1,
+    stopping at the first one found.
+
+    :return: flat array of (child, parent) pairs for the vertexes found
+    """
+    offsets = reverse.offsets
+    targets = reverse.targets
+    found = array('l')
+
+    for v in range(start, end):
+        if visited[v]:
+            continue
+
+        for parent in targets[offsets[v]:offsets[v + 1]]:
+            if in_frontier[parent]:
+                found.append(v)
+                found.append(parent)
+                break
+
+    return found
+
+
+def _top_down_task(frontier):
+    return _top_down(_worker['graph'], _worker['visited'], frontier)
+
+
+def _bottom_up_task(bounds):
+    return _bottom_up(_worker['reverse'], _worker['visited'],
+                      _worker['frontier'], bounds[0], bounds[1])
+
+
+def _chunks(size, parts):
+    """Split 0..size-1 in at most parts contiguous (start, end) ranges"""
+    step = max(1, -(-size // parts))
+    return [(i, min(i + step, size)) for i in range(0, size, step)]
+
+
+def breadth_first_search(graph, start, processes=None, alpha=14, beta=24,
+                         parallel_threshold=1 << 16):
+    """
+    Run a level synchronous Breadth First Search over a CompactGraph, handling
+    a whole frontier at a time.
+
+    Each level is expanded top-down from the frontier while it is small, and
+    switches to bottom-up steps, where every unvisited vertex looks for a
+    parent in the frontier, once the frontier edges outnumber the unexplored
+    edges by alpha. It goes back to top-down when the frontier shrinks below
+    a beta fraction of the vertexes.
+
+    :param graph: CompactGraph to be searched
+    :param start: index of the vertex from which the search starts
+    :param processes: number of worker processes, None to run in this process
+    :param alpha: top-down to bottom-up switching factor
+    :param beta: bottom-up to top-down switching factor
+    :param parallel_threshold: least frontier size split across the workers
+
+    :return: tuple with the hop distance and parent arrays, unreached vertexes
+             have UNREACHED in both
+    """
+    size = len(graph)
+    reverse = graph.reverse()
+    hops = array('l', [UNREACHED]) * size
+    parents = array('l', [UNREACHED]) * size
+
+    pool = None
+    if processes and processes > 1:
+        # only paid for by the callers asking for worker processes
+        import multiprocessing
+
+        visited = multiprocessing.RawArray('b', size)
+        in_frontier = multiprocessing.RawArray('b', size)
+        pool = multiprocessing.Pool(processes, _init_worker, ({
+            'graph': graph,
+            'reverse': reverse,
+            'visited': visited,
+            'frontier': in_frontier,
+        },))
+    else:
+        visited = bytearray(size)
+        in_frontier = bytearray(size)
+
+    hops[start] = 0
+    visited[start] = 1
+    frontier = array('l', [start])
+    unexplored_edges = len(graph.targets) - graph.degree(start)
+    bottom_up = False
+    level = 0
+
+    try:
+        while frontier:
+            frontier_edges = sum(graph.degree(v) for v in frontier)
+            if not bottom_up and frontier_edges > unexplored_edges / alpha:
+                bottom_up = True
+            elif bottom_up and len(frontier) < size / beta:
+                bottom_up = False
+
+            parallel = pool is not None and len(frontier) >= parallel_threshold
+
+            if bottom_up:
+                for v in frontier:
+                    in_frontier[v] = 1
+
+                if parallel:
+                    results = pool.map(_bottom_up_task, _chunks(size, processes))
+                else:
+                    results = [_bottom_up(reverse, visited, in_frontier, 0, size)]
+
+                for v in frontier:
+                    in_frontier[v] = 0
+            elif parallel:
+                step = -(-len(frontier) // processes)
+                batches = [frontier[i:i + step]
+                           for i in range(0, len(frontier), step)]
+                results = pool.map(_top_down_task, batches)
+            else:
+                results = [_top_down(graph, visited, frontier)]
+
+            # merge the batches, the first parent found for a child wins
+            level += 1
+            next_frontier = array('l')
+            for found in results:
+                for idx in range(0, len(found), 2):
+                    child = found[idx]
+                    if not visited[child]:
+                        visited[child] = 1
+                        hops[child] = level
+                        parents[child] = found[idx + 1]
+                        next_frontier.append(child)
+
+            unexplored_edges -= sum(graph.degree(v) for v in next_frontier)
+            frontier = next_frontier
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return hops, parents
+
+
+# ------------------------------------------------------------------------------
+# Bucket Based Shortest Paths --------------------------------------------------
+# ------------------------------------------------------------------------------
+def _check_integer_weights(graph):
+    """Bucket queues index distances, so they need non negative integers"""
+    if graph.weights.typecode != 'l':
+        raise ValueError('Bucket based searches need integer weights')
+
+    if graph.weights and min(graph.weights) < 0:
+        raise ValueError('Bucket based searches need non negative weights')
+
+
+def path_to(parents, start, end):
+    """
+    Get the vertexes from start to end following the parents array given by a
+    search from start over a CompactGraph.
+
+    :return: list of vertex indexes, empty if end was not reached
+    """
+    if end != start and parents[end] == UNREACHED:
+        return []
+
+    path = [end]
+    while path[-1] != start:
+        path.append(parents[path[-1]])
+
+    path.reverse()
+    return path
+
+
+def dijkstra(graph, start):
+    """
+    Run the dijkstra algorithm with a binary heap of (distance, vertex)
+    entries, the comparison based baseline for the bucket algorithms below.
+    Entries left behind by a later improvement are skipped when popped.
+
+    :param graph: CompactGraph with non negative weights
+    :param start: index of the vertex from which the search starts
+
+    :return: tuple with the distance and parent arrays, unreached vertexes
+             have UNREACHED in both
+    """
+    size = len(graph)
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    distances = array(weights.typecode, [UNREACHED]) * size
+    parents = array('l', [UNREACHED]) * size
+    settled = bytearray(size)
+
+    distances[start] = 0
+    vertex_heap = [(0, start)]
+    while vertex_heap:
+        distance, node = heapq.heappop(vertex_heap)
+        if settled[node]:
+            continue
+
+        settled[node] = 1
+        for idx in range(offsets[node], offsets[node + 1]):
+            neighboor = targets[idx]
+            path_distance = distance + weights[idx]
+            old_distance = distances[neighboor]
+
+            if old_distance == UNREACHED or path_distance < old_distance:
+                distances[neighboor] = path_distance
+                parents[neighboor] = node
+                heapq.heappush(vertex_heap, (path_distance, neighboor))
+
+    return distances, parents
+
+
+def dial(graph, start):
+    """
+    Run Dial's algorithm, the dijkstra algorithm with the priority queue
+    replaced by a circular array of max weight + 1 buckets, one for each
+    distance that can be pending at a time. It pays off when the max weight is
+    small compared to the number of vertexes.
+
+    :param graph: CompactGraph with non negative integer weights
+    :param start: index of the vertex from which the search starts
+
+    :return: tuple with the distance and parent arrays, unreached vertexes
+             have UNREACHED in both
+    """
+    _check_integer_weights(graph)
+    size = len(graph)
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    distances = array('l', [UNREACHED]) * size
+    parents = array('l', [UNREACHED]) * size
+    settled = bytearray(size)
+
+    slots = (max(weights) if weights else 0) + 1
+    buckets = [[] for _ in range(slots)]
+    buckets[0].append(start)
+    distances[start] = 0
+    pending = 1
+    current = 0
+
+    while pending:
+        bucket = buckets[current % slots]
+
+        # zero weight edges may push back into the bucket being emptied
+        while bucket:
+            node = bucket.pop()
+            pending -= 1
+
+            # skip the stale copies left by later improvements
+            if settled[node] or distances[node] != current:
+                continue
+
+            settled[node] = 1
+            for idx in range(offsets[node], offsets[node + 1]):
+                neighboor = targets[idx]
+                path_distance = current + weights[idx]
+                old_distance = distances[neighboor]
+
+                if old_distance == UNREACHED or path_distance < old_distance:
+                    distances[neighboor] = path_distance
+                    parents[neighboor] = node
+                    buckets[path_distance % slots].append(neighboor)
+                    pending += 1
+
+        current += 1
+
+    return distances, parents
+
+
+def _requests(graph, distances, nodes, delta, light):
+    """
+    Relaxation requests for the light (weight <= delta) or heavy edges leaving
+    a batch of nodes.
+
+    :return: flat array of (neighboor, distance, parent) triples
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    requests = array('l')
+
+    for node in nodes:
+        base = distances[node]
+        for idx in range(offsets[node], offsets[node + 1]):
+            if (weights[idx] <= delta) != light:
+                continue
+
+            neighboor = targets[idx]
+            path_distance = base + weights[idx]
+            old_distance = distances[neighboor]
+            if old_distance == UNREACHED or path_distance < old_distance:
+                requests.append(neighboor)
+                requests.append(path_distance)
+                requests.append(node)
+
+    return requests
+
+
+def _requests_task(task):
+    nodes, light = task
+    return _requests(_worker['graph'], _worker['distances'], nodes,
+                     _worker['delta'], light)
+
+
+def delta_stepping(graph, start, delta=None, processes=None,
+                   parallel_threshold=1 << 12):
+    """
+    Run the delta-stepping algorithm: vertexes are kept in buckets of delta
+    distance width and each bucket is settled in phases, relaxing the light
+    edges of the whole bucket as one batch until it stops refilling, and then
+    the heavy edges once.
+
+    :param graph: CompactGraph with non negative integer weights
+    :param start: index of the vertex from which the search starts
+    :param delta: bucket width, by default the max weight over the average
+                  degree
+    :param processes: number of worker processes, None to run in this process
+    :param parallel_threshold: least batch size split across the workers
+
+    :return: tuple with the distance and parent arrays, unreached vertexes
+             have UNREACHED in both
+    """
+    _check_integer_weights(graph)
+    size = len(graph)
+
+    if delta is None:
+        max_weight = max(graph.weights) if graph.weights else 1
+        avg_degree = max(1, len(graph.targets) // max(1, size))
+        delta = max(1, max_weight // avg_degree)
+
+    pool = None
+    if processes and processes > 1:
+        import multiprocessing
+
+        distances = multiprocessing.RawArray('l', size)
+        pool = multiprocessing.Pool(processes, _init_worker, ({
+            'graph': graph,
+            'distances': distances,
+            'delta': delta,
+        },))
+    else:
+        distances = array('l', [0]) * size
+
+    parents = array('l', [UNREACHED]) * size
+    for v in range(size):
+        distances[v] = UNREACHED
+
+    def find_requests(nodes, light):
+        nodes = array('l', nodes)
+        if pool is None or len(nodes) < parallel_threshold:
+            return [_requests(graph, distances, nodes, delta, light)]
+
+        step = -(-len(nodes) // processes)
+        return pool.map(_requests_task, [
+            (nodes[i:i + step], light) for i in range(0, len(nodes), step)
+        ])
+
+    def relax(batches):
+        for requests in batches:
+            for idx in range(0, len(requests), 3):
+                neighboor = requests[idx]
+                path_distance = requests[idx + 1]
+                old_distance = distances[neighboor]
+
+                if old_distance != UNREACHED and path_distance >= old_distance:
+                    continue
+
+                if old_distance != UNREACHED:
+                    buckets[old_distance // delta].discard(neighboor)
+
+                slot = path_distance // delta
+                while len(buckets) <= slot:
+                    buckets.append(set())
+
+                buckets[slot].add(neighboor)
+                distances[neighboor] = path_distance
+                parents[neighboor] = requests[idx + 2]
+
+    buckets = [{start}]
+    distances[start] = 0
+    current = 0
+
+    try:
+        while current < len(buckets):
+            if not buckets[current]:
+                current += 1
+                continue
+
+            settled = set()
+            while buckets[current]:
+                nodes = buckets[current]
+                buckets[current] = set()
+                settled |= nodes
+                relax(find_requests(nodes, light=True))
+
+            relax(find_requests(settled, light=False))
+            current += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return array('l', distances), parents
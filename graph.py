@@ -10,11 +10,13 @@ from __future__ import absolute_import, unicode_literals
 
 from enum import Enum
 
-from helpers import BinaryMinHeap, Queue
+from helpers import DAryHeap, Queue
 
 
 class Edge(object):
     """Implements an abstractio to graph's Edge"""
+    __slots__ = ('source', 'neighboor', 'distance')
+
     def __init__(self, source, neighboor, distance):
         super(Edge).__init__()
         self.source = source
@@ -35,6 +37,10 @@ class Edge(object):
 
 class Vertex(object):
     """Implements an abstraction to graph's Vertex"""
+    __slots__ = (
+        'label', 'distance', 'edges', 'previous', 'visited', 'color',
+    )
+
     class Color(Enum):
         """For First-Search purpuses"""
         WHITE = 0
@@ -89,12 +95,18 @@ class Graph(object):
     def __init__(self):
         super(Graph).__init__()
         self.vertexes = []
+        self.digraph = False
+
+        # dynamic shortest path tree state, see track_shortest_paths
+        self.spt_source = None
+        self.incoming = {}
 
     def __repr__(self):
         return ('Graph(vertexes={})').format(len(self.vertexes))
 
     def create_from_file(self, filename, digraph=False):
         """Create a graph from a file with a matrix of distances"""
+        self.digraph = digraph
 
         # read matrix of distances from file
         with open(filename, 'r') as adjacency_list:
@@ -132,6 +144,10 @@ class Graph(object):
             vertex.visited = False
             vertex.color = Vertex.Color.WHITE
 
+        # the shortest path tree is gone, so stop tracking it
+        self.spt_source = None
+        self.incoming = {}
+
     def path(self, start, end):
         """
         Get the shortest path from start to end after the dijkstra algorithm is
@@ -167,7 +183,12 @@ class Graph(object):
     def dijkstra(self, start, end=None):
         """
         Run the dijkstra algorithm to find the shortest path from start node to
-        end node using a BinaryMinHeap to keep the priority queue efficient.
+        end node using a DAryHeap to keep the priority queue efficient.
+
+        The heap holds (distance, sequence, node) entries, the sequence keeps
+        Vertex objects out of the comparisons, and entries left behind by a
+        later improvement are skipped when popped. Only the nodes reached are
+        touched, so graphs loading their vertexes lazily stay lazy.
 
         If no end node is passed, this algorithm will find the min distance of
         every node from the start.
@@ -178,13 +199,15 @@ class Graph(object):
 
         # setup vertex heap based in distance
         start.distance = 0
-        vertex_heap = BinaryMinHeap()
-        vertex_heap.add_to_heap(start)
+        sequence = 1
+        vertex_heap = DAryHeap(elements=[(start.distance, 0, start)])
 
         # run the loop checking for edges
-        while vertex_heap.heap:
+        while vertex_heap:
             # get the next in the priority queue
-            node = vertex_heap.extract_min()
+            distance, _, node = vertex_heap.extract_min()
+            if node.visited or distance != node.distance:
+                continue
 
             # loop over the node edges
             for edge in node.edges:
@@ -195,11 +218,10 @@ class Graph(object):
                 path_distance = node.distance + edge.distance
 
                 if path_distance < neighboor.distance:
-                    if neighboor.distance == float('inf'):
-                        vertex_heap.add_to_heap(neighboor)
-
                     neighboor.distance = path_distance
                     neighboor.previous = node
+                    vertex_heap.push((path_distance, sequence, neighboor))
+                    sequence += 1
 
             # check if the end node is the one popped and the algorithm can end
             node.visited = True
@@ -265,3 +287,223 @@ class Graph(object):
 
                     if end == neighboor:
                         return
+
+    # --------------------------------------------------------------------------
+    # Dynamic Shortest Paths ---------------------------------------------------
+    # --------------------------------------------------------------------------
+    def track_shortest_paths(self, start):
+        """
+        Run the dijkstra algorithm from start and keep its shortest path tree
+        up to date on every later call to add_edge, remove_edge or update_edge.
+
+        Only the part of the tree affected by each update is repaired, so the
+        distances and previous nodes stay valid without running dijkstra from
+        scratch. Calling reset stops the tracking.
+
+        :param start: source node of the shortest path tree
+        """
+        self.reset()
+        self.dijkstra(start)
+        self.spt_source = start
+
+        # index the edges arriving in each node to repair the tree bottom up
+        self.incoming = {vertex: [] for vertex in self.vertexes}
+        for vertex in self.vertexes:
+            for edge in vertex.edges:
+                self.incoming[edge.neighboor].append(edge)
+
+    def add_edge(self, v_from, v_to, distance):
+        """
+        Add an edge to the graph, both ways if the graph is not a digraph.
+
+        :param v_from: node where the edge starts
+        :param v_to: node where the edge ends
+        :param distance: weight of the new edge
+        """
+        inserted = []
+        for source, target in self._directions(v_from, v_to):
+            source.add_edge(target, distance)
+            inserted.append(source.edges[-1])
+
+        if self.spt_source is None:
+            return
+
+        for edge in inserted:
+            self.incoming[edge.neighboor].append(edge)
+
+        for edge in inserted:
+            self._repair_decrease(edge)
+
+    def remove_edge(self, v_from, v_to):
+        """
+        Remove every edge between two nodes, both ways if the graph is not a
+        digraph.
+
+        :param v_from: node where the edge starts
+        :param v_to: node where the edge ends
+        """
+        # look every direction up first, so a missing edge changes nothing
+        directions = [
+            (source, target, self._find_edges(source, target))
+            for source, target in self._directions(v_from, v_to)
+        ]
+
+        removed = []
+        for source, target, edges in directions:
+            source.edges = [e for e in source.edges if e.neighboor is not target]
+            removed.extend(edges)
+
+        if self.spt_source is None:
+            return
+
+        roots = [e.neighboor for e in removed if self._is_tree_edge(e)]
+        for edge in removed:
+            self.incoming[edge.neighboor] = [
+                e for e in self.incoming[edge.neighboor]
+                if e.source is not edge.source
+            ]
+
+        for root in roots:
+            self._repair_increase(root)
+
+    def update_edge(self, v_from, v_to, distance):
+        """
+        Change the weight of every edge between two nodes, both ways if the
+        graph is not a digraph.
+
+        :param v_from: node where the edge starts
+        :param v_to: node where the edge ends
+        :param distance: new weight of the edges
+        """
+        updated = []
+        roots = []
+        for source, target in self._directions(v_from, v_to):
+            for edge in self._find_edges(source, target):
+                # the tree check needs the weight before the update
+                if distance > edge.distance and self._is_tree_edge(edge):
+                    roots.append(target)
+
+                edge.distance = distance
+                updated.append(edge)
+
+        if self.spt_source is None:
+            return
+
+        for root in roots:
+            self._repair_increase(root)
+
+        for edge in updated:
+            self._repair_decrease(edge)
+
+    def _directions(self, v_from, v_to):
+        """Give the (source, target) pairs an edge stands for in this graph"""
+        # a self-loop is the same edge both ways
+        if self.digraph or v_from is v_to:
+            return [(v_from, v_to)]
+
+        return [(v_from, v_to), (v_to, v_from)]
+
+    def _find_edges(self, source, target):
+        """Get the edges from source to target or fail if there is none"""
+        edges = [e for e in source.edges if e.neighboor is target]
+        if not edges:
+            raise ValueError(
+                'No edge between {} and {}'.format(source.label, target.label)
+            )
+
+        return edges
+
+    def _is_tree_edge(self, edge):
+        """Check if the edge is part of the tracked shortest path tree"""
+        return edge.neighboor.previous is edge.source
+
+    def _repair_decrease(self, edge):
+        """
+        Repair the shortest path tree after an edge got cheaper (or was
+        inserted), pushing the improvement down from the edge's neighboor.
+        """
+        source = edge.source
+        target = edge.neighboor
+        path_distance = source.distance + edge.distance
+
+        if path_distance >= target.distance:
+            return
+
+        target.distance = path_distance
+        target.previous = source
+
+        self._propagate([target])
+
+    def _repair_increase(self, root):
+        """
+        Repair the shortest path tree after the edge reaching root got more
+        expensive (or was removed). Only the subtree hanging from root can have
+        its distances changed, so it is the only part to be recomputed.
+        """
+        # collect the subtree walking the tree edges from the root
+        subtree = [root]
+        in_subtree = {root}
+        idx = 0
+        while idx < len(subtree):
+            node = subtree[idx]
+            idx += 1
+
+            for edge in node.edges:
+                child = edge.neighboor
+                if child.previous is node and child not in in_subtree:
+                    in_subtree.add(child)
+                    subtree.append(child)
+
+        for node in subtree:
+            node.distance = float('inf')
+            node.previous = None
+            node.visited = False
+
+        # seed every subtree node with its best edge from outside the subtree
+        seeds = []
+        for node in subtree:
+            for edge in self.incoming[node]:
+                if edge.source in in_subtree:
+                    continue
+
+                path_distance = edge.source.distance + edge.distance
+                if path_distance < node.distance:
+                    node.distance = path_distance
+                    node.previous = edge.source
+
+            if node.distance != float('inf'):
+                seeds.append(node)
+
+        self._propagate(seeds)
+
+    def _propagate(self, seeds):
+        """
+        Run the dijkstra loop from the seed nodes, relaxing only the edges that
+        improve a distance.
+
+        It uses the same lazy heap as dijkstra, so the repair cost is bound
+        to the nodes it touches.
+
+        :param seeds: nodes whose distances were already updated
+        """
+        sequence = len(seeds)
+        vertex_heap = DAryHeap(elements=[
+            (node.distance, idx, node) for idx, node in enumerate(seeds)
+        ])
+
+        while vertex_heap:
+            distance, _, node = vertex_heap.extract_min()
+            if distance != node.distance:
+                continue
+
+            node.visited = True
+
+            for edge in node.edges:
+                neighboor = edge.neighboor
+                path_distance = node.distance + edge.distance
+
+                if path_distance < neighboor.distance:
+                    neighboor.distance = path_distance
+                    neighboor.previous = node
+                    vertex_heap.push((path_distance, sequence, neighboor))
+                    sequence += 1
@@ -9,6 +9,8 @@ implement Dijkstra's algorithm.
 """
 from __future__ import absolute_import, unicode_literals
 
+import heapq
+from array import array
 from collections import deque
 
 
@@ -54,6 +56,11 @@ class BinaryMinHeap(object):
 
         self.unheaped = False
 
+    def add_to_heap(self, e):
+        """Add an element to the heap, which is rebuilt on the next extraction"""
+        self.heap.append(e)
+        self.unheaped = True
+
     def extract_min(self):
         """Get minimum element preserving the heap property"""
         # change the first and last elements
@@ -68,6 +75,261 @@ class BinaryMinHeap(object):
         # return the minimum
         return minimum
 
+    def push_many(self, elements):
+        """Add many elements at once, heapifying them all on the next pop"""
+        self.heap.extend(elements)
+        self.unheaped = True
+
+    def pop_many(self, k):
+        """
+        Get the k smallest elements in order, building the heap only once for
+        all of them.
+
+        :param k: number of elements to pop
+        :return: list with at most k elements
+        """
+        if self.unheaped:
+            self.build_min_heap()
+
+        popped = []
+        while self.heap and len(popped) < k:
+            self.heap[0], self.heap[-1] = self.heap[-1], self.heap[0]
+            popped.append(self.heap.pop())
+            self.min_heapify(0)
+
+        self.unheaped = True
+        return popped
+
+
+class DAryHeap(object):
+    """
+    A min heap where every node has arity children. Wider nodes make the heap
+    shallower, so pushes are cheaper and pops compare more children per level.
+    """
+    def __init__(self, arity=4, elements=()):
+        super(DAryHeap, self).__init__()
+        if arity < 2:
+            raise ValueError('A heap arity must be at least 2')
+
+        self.arity = arity
+        self.heap = []
+        self.push_many(elements)
+
+    def __repr__(self):
+        return (
+            'DAryHeap(arity={}, '
+            'size={}, '
+            'min={})'
+        ).format(self.arity, len(self.heap), self.heap[0] if self.heap else None)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def _sift_up(self, idx):
+        heap = self.heap
+        element = heap[idx]
+        while idx > 0:
+            parent = (idx - 1) // self.arity
+            if not heap[parent] > element:
+                break
+
+            heap[idx] = heap[parent]
+            idx = parent
+
+        heap[idx] = element
+
+    def _sift_down(self, idx):
+        heap = self.heap
+        length = len(heap)
+        element = heap[idx]
+        while True:
+            first = self.arity * idx + 1
+            if first >= length:
+                break
+
+            smallest = first
+            for child in range(first + 1, min(first + self.arity, length)):
+                if heap[smallest] > heap[child]:
+                    smallest = child
+
+            if not element > heap[smallest]:
+                break
+
+            heap[idx] = heap[smallest]
+            idx = smallest
+
+        heap[idx] = element
+
+    def push(self, element):
+        """Add an element preserving the heap property"""
+        self.heap.append(element)
+        self._sift_up(len(self.heap) - 1)
+
+    def push_many(self, elements):
+        """
+        Add many elements at once. Big batches are appended and the whole heap
+        is rebuilt in linear time instead of sifting each element up.
+        """
+        elements = list(elements)
+        if len(elements) <= len(self.heap) // 4:
+            for element in elements:
+                self.push(element)
+            return
+
+        self.heap.extend(elements)
+        for idx in reversed(range((len(self.heap) - 2) // self.arity + 1)):
+            self._sift_down(idx)
+
+    def extract_min(self):
+        """Get minimum element preserving the heap property"""
+        last = self.heap.pop()
+        if not self.heap:
+            return last
+
+        minimum = self.heap[0]
+        self.heap[0] = last
+        self._sift_down(0)
+        return minimum
+
+    def pop_many(self, k):
+        """Get the k smallest elements in order"""
+        return [self.extract_min() for _ in range(min(k, len(self.heap)))]
+
+
+class IndexedMinHeap(object):
+    """
+    A binary min heap of (priority, id) pairs for ids in 0..capacity-1, kept
+    in parallel typed arrays so that no object comparison is involved. Each
+    id is in the heap at most once and pushing it again changes its priority.
+    """
+    def __init__(self, capacity):
+        super(IndexedMinHeap, self).__init__()
+        self.priorities = array('d')
+        self.ids = array('l')
+        self.positions = array('l', [-1]) * capacity
+
+    def __repr__(self):
+        return (
+            'IndexedMinHeap(size={}, '
+            'capacity={})'
+        ).format(len(self.ids), len(self.positions))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, e):
+        return self.positions[e] != -1
+
+    def priority(self, e):
+        """Get the priority of an id in the heap"""
+        return self.priorities[self.positions[e]]
+
+    def _move(self, idx, priority, e):
+        self.priorities[idx] = priority
+        self.ids[idx] = e
+        self.positions[e] = idx
+
+    def _sift_up(self, idx):
+        priorities = self.priorities
+        priority = priorities[idx]
+        e = self.ids[idx]
+        while idx > 0:
+            parent = (idx - 1) >> 1
+            if priorities[parent] <= priority:
+                break
+
+            self._move(idx, priorities[parent], self.ids[parent])
+            idx = parent
+
+        self._move(idx, priority, e)
+
+    def _sift_down(self, idx):
+        priorities = self.priorities
+        length = len(priorities)
+        priority = priorities[idx]
+        e = self.ids[idx]
+        while True:
+            child = 2 * idx + 1
+            if child >= length:
+                break
+
+            if child + 1 < length and priorities[child + 1] < priorities[child]:
+                child += 1
+
+            if priority <= priorities[child]:
+                break
+
+            self._move(idx, priorities[child], self.ids[child])
+            idx = child
+
+        self._move(idx, priority, e)
+
+    def push(self, e, priority):
+        """Add an id to the heap or change its priority if already there"""
+        idx = self.positions[e]
+        if idx == -1:
+            self.priorities.append(priority)
+            self.ids.append(e)
+            self.positions[e] = len(self.ids) - 1
+            self._sift_up(len(self.ids) - 1)
+        elif priority < self.priorities[idx]:
+            self.priorities[idx] = priority
+            self._sift_up(idx)
+        else:
+            self.priorities[idx] = priority
+            self._sift_down(idx)
+
+    def push_many(self, ids, priorities):
+        """
+        Add many ids at once, not in the heap yet, rebuilding the heap in
+        linear time. Nothing is added if any id is already in the heap or
+        repeated in the batch.
+        """
+        ids = list(ids)
+        seen = set()
+        for e in ids:
+            if self.positions[e] != -1 or e in seen:
+                raise ValueError('Id {} is already in the heap'.format(e))
+            seen.add(e)
+
+        for e, priority in zip(ids, priorities):
+            self.priorities.append(priority)
+            self.ids.append(e)
+            self.positions[e] = len(self.ids) - 1
+
+        for idx in reversed(range(len(self.ids) // 2)):
+            self._sift_down(idx)
+
+    def extract_min(self):
+        """
+        Get the id with minimum priority preserving the heap property.
+
+        :return: tuple with the id and its priority
+        """
+        e = self.ids[0]
+        priority = self.priorities[0]
+        self.positions[e] = -1
+
+        last_priority = self.priorities.pop()
+        last = self.ids.pop()
+        if self.ids:
+            self._move(0, last_priority, last)
+            self._sift_down(0)
+
+        return e, priority
+
+    def pop_many(self, k):
+        """Get the k (id, priority) pairs with smallest priorities in order"""
+        return [self.extract_min() for _ in range(min(k, len(self.ids)))]
+
+
+def top_k(elements, k, key=None):
+    """
+    Get the k smallest elements of an iterable in order, in O(n log k) time
+    keeping only k elements at a time.
+    """
+    return heapq.nsmallest(k, elements, key=key)
+
 
 class Queue(object):
     """Simple FIFO data structure"""
@@ -85,3 +347,41 @@ class Queue(object):
 
     def __len__(self):
         return len(self.queue)
+
+
+class UnionFind(object):
+    """Disjoint sets over the integers 0..size-1 kept in flat arrays"""
+    def __init__(self, size):
+        super(UnionFind, self).__init__()
+        self.parent = array('l', range(size))
+        self.size = array('l', [1]) * size
+
+    def __len__(self):
+        return len(self.parent)
+
+    def find(self, e):
+        """Get the representative of e's set, halving the path on the way"""
+        parent = self.parent
+        while parent[e] != e:
+            parent[e] = parent[parent[e]]
+            e = parent[e]
+
+        return e
+
+    def union(self, a, b):
+        """
+        Merge the sets of a and b attaching the smaller set to the bigger one.
+
+        :return: False if a and b were already in the same set, True otherwise
+        """
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return False
+
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return True
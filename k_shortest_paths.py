@@ -0,0 +1,137 @@
+# -*- encoding: utf-8 -*-
+"""
+Alternative routes with Yen's k shortest loopless paths, running on the
+compact graph representation.
+
+Yen's algorithm runs a point-to-point search for every spur node of every path
+found, each one with some vertexes and edges taken out. The searches keep their
+state in dicts of their own, sized by the region they explore, so there is
+nothing to reset in the graph between them.
+
+:author: Andre Filliettaz
+:email: andrentaz@gmail.com
+:github: https://github.com/andrentaz
+"""
+from __future__ import absolute_import, unicode_literals
+
+from compact import as_compact
+from helpers import DAryHeap
+
+
+def shortest_path(graph, start, end, banned_vertexes=(), banned_edges=()):
+    """
+    Run the dijkstra algorithm from start until end is popped, ignoring some
+    vertexes and edges.
+
+    :param graph: CompactGraph or graph.Graph
+    :param start: index of the vertex where the path starts
+    :param end: index of the vertex where the path ends
+    :param banned_vertexes: set of vertex indexes the path can't go through
+    :param banned_edges: set of (from, to) pairs the path can't use
+
+    :return: tuple with the distance and the list of vertex indexes, or
+             infinity and an empty list if end can't be reached
+    """
+    graph = as_compact(graph)
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    distances = {start: 0}
+    parents = {start: None}
+    settled = set()
+
+    # entries left behind by a later improvement are skipped when popped
+    vertex_heap = DAryHeap(elements=[(0, start)])
+    while vertex_heap:
+        distance, node = vertex_heap.extract_min()
+        if node in settled:
+            continue
+
+        settled.add(node)
+        if node == end:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = parents[node]
+
+            path.reverse()
+            return distance, path
+
+        for idx in range(offsets[node], offsets[node + 1]):
+            neighboor = targets[idx]
+            if (neighboor in settled or neighboor in banned_vertexes
+                    or (node, neighboor) in banned_edges):
+                continue
+
+            path_distance = distance + weights[idx]
+            if path_distance < distances.get(neighboor, float('inf')):
+                distances[neighboor] = path_distance
+                parents[neighboor] = node
+                vertex_heap.push((path_distance, neighboor))
+
+    return float('inf'), []
+
+
+def _edge_weight(graph, v_from, v_to):
+    """Lightest weight among the edges from v_from to v_to"""
+    return min(w for target, w in graph.edges(v_from) if target == v_to)
+
+
+def yen(graph, start, end, k):
+    """
+    Find the k shortest loopless paths from start to end with Yen's
+    algorithm.
+
+    Each new path is searched among deviations from the last one found: for
+    every spur node along it, the search restarts from there keeping the
+    root path up to it, with the root vertexes and the edges already taken
+    by known paths sharing that root left out.
+
+    :param graph: CompactGraph or graph.Graph
+    :param start: index of the vertex where the paths start
+    :param end: index of the vertex where the paths end
+    :param k: number of paths wanted
+
+    :return: list with at most k (distance, path) tuples, shortest first
+    """
+    graph = as_compact(graph)
+    distance, path = shortest_path(graph, start, end)
+    if not path or k < 1:
+        return []
+
+    found = [(distance, path)]
+    candidates = DAryHeap()
+    seen = {tuple(path)}
+
+    while len(found) < k:
+        _, last = found[-1]
+
+        root_distance = 0
+        for spur_idx in range(len(last) - 1):
+            spur = last[spur_idx]
+            root = last[:spur_idx + 1]
+
+            banned_edges = set(
+                (p[spur_idx], p[spur_idx + 1])
+                for _, p in found
+                if len(p) > spur_idx + 1 and p[:spur_idx + 1] == root
+            )
+            spur_distance, spur_path = shortest_path(
+                graph, spur, end, set(root[:-1]), banned_edges,
+            )
+
+            if spur_path:
+                candidate = root[:-1] + spur_path
+                if tuple(candidate) not in seen:
+                    seen.add(tuple(candidate))
+                    candidates.push((root_distance + spur_distance, candidate))
+
+            root_distance += _edge_weight(graph, spur, last[spur_idx + 1])
+
+        if not candidates:
+            break
+
+        found.append(candidates.extract_min())
+
+    return found
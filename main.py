@@ -0,0 +1,386 @@
+# -*- encoding: utf-8 -*-
+"""
+This is the single driver program for the graph modules, with one subcommand
+for each task:
+
+    sp          shortest paths with dijkstra, dial or delta stepping
+    bfs, dfs    Breadth and Depth First Search
+    components  connected components and reachability
+    bench       time the shortest path algorithms over the queries
+    snapshot    write a graph in the partitioned binary format
+
+The graph is loaded once for a whole batch of queries, read from a file with
+one 'start [end]' query per line, and every result is printed as soon as it is
+ready as one JSON object per line.
+
+The input format is detected from the file: partitioned snapshots are opened
+lazily, anything else is read as an edge list, gzip compressed or not, with
+'-' for stdin. The graph modules are only imported by the subcommands that
+need them, so the program starts fast.
+"""
+import argparse
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+# same as partitioned.PARTITION_MAGIC, kept here so detection imports nothing
+PARTITION_MAGIC = b'LBHPART1'
+
+
+def emit(result):
+    """Print a result as a JSON line right away"""
+    sys.stdout.write(json.dumps(result, allow_nan=False) + '\n')
+    sys.stdout.flush()
+
+
+def is_snapshot(filename):
+    """Check for the partitioned format magic without loading anything"""
+    if filename == '-':
+        return False
+
+    with open(filename, 'rb') as graph_file:
+        return graph_file.read(len(PARTITION_MAGIC)) == PARTITION_MAGIC
+
+
+def load_compact(filename, digraph):
+    """Read a snapshot or an edge list into a CompactGraph"""
+    if is_snapshot(filename):
+        from partitioned import PartitionedGraph
+
+        with PartitionedGraph(filename) as graph:
+            return graph.to_compact()
+
+    from streaming import build_from_stream
+
+    return build_from_stream(filename, digraph=digraph)
+
+
+@contextmanager
+def load_graph(filename, digraph):
+    """Get a graph.Graph from a snapshot or an edge list, closing it after"""
+    if is_snapshot(filename):
+        from partitioned import PartitionedGraph
+
+        with PartitionedGraph(filename) as graph:
+            yield graph
+        return
+
+    yield load_compact(filename, digraph).to_graph()
+
+
+def read_queries(args):
+    """
+    Give the (start, end) queries from the queries file, or the single one
+    from the command line. The end is None when not given.
+    """
+    if args.queries is None:
+        yield args.start, args.end
+        return
+
+    with open(args.queries, 'r') as queries:
+        for line in queries:
+            tokens = line.split()
+            if not tokens:
+                continue
+
+            yield int(tokens[0]), int(tokens[1]) if len(tokens) > 1 else None
+
+
+def query_vertexes(graph, start, end):
+    """Get the start and end vertexes, or None for the ones not in the graph"""
+    size = len(graph.vertexes)
+    v_start = graph.vertexes[start] if 0 <= start < size else None
+    v_end = None
+    if end is not None:
+        v_end = graph.vertexes[end] if 0 <= end < size else None
+
+    return v_start, v_end
+
+
+def clear(graph):
+    """Clear the search state between queries"""
+    graph.reset()
+
+    # lazy graphs also drop the vertexes the query created
+    release = getattr(graph, 'release', None)
+    if release is not None:
+        release()
+
+
+def path_result(graph, start, end, v_start, v_end):
+    """Result for a query with an end node, after a search ran"""
+    path = graph.path(v_start, v_end)
+    reachable = path.get('distance') != float('inf')
+    return {
+        'start': start,
+        'end': end,
+        'reachable': reachable,
+        'distance': path.get('distance') if reachable else None,
+        'path': [int(n.label) for n in path.get('path')],
+    }
+
+
+def search_command(args):
+    """Run the sp, bfs or dfs searches for every query"""
+    if args.command == 'sp' and args.algorithm != 'dijkstra':
+        run_bucket_searches(args, load_compact(args.filename, args.digraph))
+        return
+
+    with load_graph(args.filename, args.digraph) as graph:
+        run_searches(args, graph)
+
+
+def run_searches(args, graph):
+    """Run the search of the subcommand from every query start"""
+    search = {
+        'sp': graph.dijkstra,
+        'bfs': graph.breadth_first_search,
+        'dfs': graph.depth_first_search,
+    }[args.command]
+
+    for start, end in read_queries(args):
+        v_start, v_end = query_vertexes(graph, start, end)
+        if v_start is None or (end is not None and v_end is None):
+            emit({
+                'start': start,
+                'end': end,
+                'error': 'Non existing start or end',
+            })
+            continue
+
+        search(v_start, v_end)
+
+        if v_end is not None:
+            emit(path_result(graph, start, end, v_start, v_end))
+        else:
+            emit({
+                'start': start,
+                'reached': sum(
+                    1 for v in graph.vertexes if v.distance != float('inf')
+                ),
+            })
+
+        clear(graph)
+
+
+def run_bucket_searches(args, compact):
+    """Run the shortest paths of every query with dial or delta stepping"""
+    from compact import UNREACHED, delta_stepping, dial, path_to
+
+    search = {'dial': dial, 'delta': delta_stepping}[args.algorithm]
+    size = len(compact)
+
+    for start, end in read_queries(args):
+        if not 0 <= start < size or (end is not None and not 0 <= end < size):
+            emit({
+                'start': start,
+                'end': end,
+                'error': 'Non existing start or end',
+            })
+            continue
+
+        distances, parents = search(compact, start)
+
+        if end is None:
+            emit({
+                'start': start,
+                'reached': sum(1 for d in distances if d != UNREACHED),
+            })
+            continue
+
+        reachable = distances[end] != UNREACHED
+        emit({
+            'start': start,
+            'end': end,
+            'reachable': reachable,
+            'distance': distances[end] if reachable else None,
+            'path': path_to(parents, start, end),
+        })
+
+
+def components_command(args):
+    """Count the components, and check reachability for every query"""
+    with load_graph(args.filename, args.digraph) as graph:
+        run_components(args, graph)
+
+
+def run_components(args, graph):
+    """Find the components and answer the reachability queries"""
+    from analysis import Components, strongly_connected_components
+
+    # the analysis walks every vertex, so lazy graphs get them all created
+    for idx in range(len(graph.vertexes)):
+        graph.vertexes[idx]
+
+    components = Components(graph)
+
+    if args.queries is None and args.start is None:
+        result = {
+            'vertexes': len(graph.vertexes),
+            'components': components.count,
+        }
+        if graph.digraph:
+            strong = strongly_connected_components(graph)
+            result['strong_components'] = max(strong) + 1 if strong else 0
+
+        emit(result)
+        return
+
+    for start, end in read_queries(args):
+        if end is None:
+            emit({
+                'start': start,
+                'end': end,
+                'error': 'Missing end, reachability needs start and end',
+            })
+            continue
+
+        v_start, v_end = query_vertexes(graph, start, end)
+        if v_start is None or v_end is None:
+            emit({
+                'start': start,
+                'end': end,
+                'error': 'Non existing start or end',
+            })
+            continue
+
+        emit({
+            'start': start,
+            'end': end,
+            'may_reach': components.may_reach(v_start, v_end),
+        })
+
+
+def bench_command(args):
+    """Time loading and the shortest path algorithms over the queries"""
+    from compact import delta_stepping, dial, dijkstra
+
+    begin = time.perf_counter()
+    compact = load_compact(args.filename, args.digraph)
+    emit({'phase': 'load', 'seconds': time.perf_counter() - begin})
+
+    begin = time.perf_counter()
+    graph = compact.to_graph()
+    emit({'phase': 'objects', 'seconds': time.perf_counter() - begin})
+
+    queries = [(start, end) for start, end in read_queries(args)
+               if 0 <= start < len(compact)]
+
+    def graph_dijkstra(start):
+        graph.dijkstra(graph.vertexes[start])
+        clear(graph)
+
+    algorithms = [
+        ('graph_dijkstra', graph_dijkstra),
+        ('dijkstra', lambda start: dijkstra(compact, start)),
+    ]
+    if compact.weights.typecode == 'l':
+        algorithms.append(('dial', lambda start: dial(compact, start)))
+        algorithms.append(('delta', lambda start: delta_stepping(compact, start)))
+
+    for name, algorithm in algorithms:
+        begin = time.perf_counter()
+        for start, _ in queries:
+            algorithm(start)
+
+        emit({
+            'algorithm': name,
+            'queries': len(queries),
+            'seconds': time.perf_counter() - begin,
+        })
+
+
+def snapshot_command(args):
+    """Write the graph in the partitioned format"""
+    from partitioned import write_partitioned
+
+    write_partitioned(load_compact(args.filename, args.digraph), args.output,
+                      block_size=args.block_size)
+    emit({'snapshot': args.output})
+
+
+def build_parser():
+    """Create the parser with every subcommand"""
+    parser = argparse.ArgumentParser(
+        description='Run searches and analysis on graphs.'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    commands = [
+        ('sp', search_command, 'shortest paths with dijkstra'),
+        ('bfs', search_command, 'breadth first search'),
+        ('dfs', search_command, 'depth first search'),
+        ('components', components_command, 'components and reachability'),
+        ('bench', bench_command, 'time the shortest path algorithms'),
+    ]
+    for name, command, description in commands:
+        subparser = subparsers.add_parser(name, help=description)
+        subparser.set_defaults(function=command)
+        subparser.add_argument('filename',
+                               help='edge list, gzip edge list, snapshot or - '
+                                    'for stdin')
+        subparser.add_argument('start',
+                               help='starting node index',
+                               type=int,
+                               nargs='?')
+        subparser.add_argument('end',
+                               help='ending node index',
+                               type=int,
+                               nargs='?')
+        subparser.add_argument('--queries',
+                               help="file with one 'start [end]' query per "
+                                    'line')
+        subparser.add_argument('--digraph',
+                               help='read the edges as directed',
+                               action='store_true')
+        if name == 'sp':
+            subparser.add_argument('--algorithm',
+                                   help='shortest path algorithm, dial and '
+                                        'delta need integer weights',
+                                   choices=['dijkstra', 'dial', 'delta'],
+                                   default='dijkstra')
+
+    subparser = subparsers.add_parser('snapshot',
+                                      help='write a partitioned snapshot')
+    subparser.set_defaults(function=snapshot_command)
+    subparser.add_argument('filename',
+                           help='edge list, gzip edge list, snapshot or - '
+                                 'for stdin')
+    subparser.add_argument('output',
+                           help='path of the snapshot to be written')
+    subparser.add_argument('--block-size',
+                           help='number of vertexes in each block',
+                           type=int,
+                           default=4096)
+    subparser.add_argument('--digraph',
+                           help='read the edges as directed',
+                           action='store_true')
+
+    return parser
+
+
+def main(argv=None):
+    """Parse the arguments and run the subcommand"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    needs_start = args.command in ('sp', 'bfs', 'dfs', 'bench')
+    if needs_start and args.queries is None and args.start is None:
+        parser.error('a start node or --queries is required')
+
+    if (args.command == 'components' and args.queries is None
+            and (args.start is None) != (args.end is None)):
+        parser.error('components takes both start and end, or none')
+
+    try:
+        args.function(args)
+    except (IOError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,298 @@
+# -*- encoding: utf-8 -*-
+"""
+A partitioned on-disk format for graphs, loaded lazily one block of vertexes
+at a time.
+
+The file starts with a header and an index with the byte offset of each block.
+Every block holds the adjacency rows of block_size consecutive vertexes: their
+row offsets, the neighboor indexes and the edge weights, all in flat arrays.
+
+PartitionedGraph reads only the header and the index when opened. The vertexes
+are created when first asked for, and their edges come from blocks kept in a
+bounded LRU cache, so searches cost memory and time by the region they explore
+and not by the size of the whole graph.
+
+:author: Andre Filliettaz
+:email: andrentaz@gmail.com
+:github: https://github.com/andrentaz
+"""
+from __future__ import absolute_import, unicode_literals
+
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+
+from compact import CompactGraph, as_compact
+from graph import Edge, Graph, Vertex
+
+PARTITION_MAGIC = b'LBHPART1'
+
+# magic, vertexes, edges, block size, float weights, digraph
+HEADER = struct.Struct('<8sqqq??')
+
+# the arrays are little endian like the header, whatever the host is
+SWAP_BYTES = sys.byteorder != 'little'
+
+
+def _write_array(values, partitioned):
+    """Write an array to the file in little endian"""
+    if SWAP_BYTES:
+        values = array(values.typecode, values)
+        values.byteswap()
+
+    values.tofile(partitioned)
+
+
+def _read_array(typecode, partitioned, count):
+    """Read count little endian items into a native array"""
+    values = array(typecode)
+    values.fromfile(partitioned, count)
+    if SWAP_BYTES:
+        values.byteswap()
+
+    return values
+
+
+def write_partitioned(graph, filename, block_size=4096):
+    """
+    Write a graph in the partitioned format.
+
+    :param graph: CompactGraph or graph.Graph to be written
+    :param filename: path of the file to be created
+    :param block_size: number of vertexes in each block
+    """
+    graph = as_compact(graph)
+    size = len(graph)
+    blocks = -(-size // block_size)
+    float_weights = graph.weights.typecode == 'd'
+
+    with open(filename, 'wb') as partitioned:
+        partitioned.write(HEADER.pack(
+            PARTITION_MAGIC, size, len(graph.targets), block_size,
+            float_weights, graph.digraph,
+        ))
+
+        # leave room for the index, it is filled once the blocks are written
+        index = array('q', [0]) * (blocks + 1)
+        index_position = partitioned.tell()
+        _write_array(index, partitioned)
+
+        for block in range(blocks):
+            index[block] = partitioned.tell()
+            first = block * block_size
+            last = min(size, first + block_size)
+            begin = graph.offsets[first]
+            end = graph.offsets[last]
+
+            _write_array(array('q', (
+                graph.offsets[v] - begin for v in range(first, last + 1)
+            )), partitioned)
+            _write_array(array('q', graph.targets[begin:end]), partitioned)
+            _write_array(array('d' if float_weights else 'q',
+                               graph.weights[begin:end]), partitioned)
+
+        index[blocks] = partitioned.tell()
+        partitioned.seek(index_position)
+        _write_array(index, partitioned)
+
+
+class LazyVertex(Vertex):
+    """
+    A Vertex of a PartitionedGraph, whose edges are read from its block every
+    time they are asked for. Its edges can't be changed.
+    """
+    __slots__ = ('graph', 'index')
+
+    def __init__(self, graph, index, distance=float("inf")):
+        # Vertex.__init__ would assign the edges, which are read only here
+        self.graph = graph
+        self.index = index
+        self.label = str(index)
+        self.distance = distance
+        self.previous = None
+        self.visited = False
+        self.color = Vertex.Color.WHITE
+
+    @property
+    def edges(self):
+        """Give the Edges leaving the vertex, faulting its block in"""
+        return [
+            Edge(self, self.graph.vertexes[v_to], weight)
+            for v_to, weight in self.graph.edges(self.index)
+        ]
+
+    def add_edge(self, vertex, dist):
+        raise self.graph.ReadOnlyError('PartitionedGraph vertexes are read only')
+
+
+class LazyVertexes(object):
+    """
+    The vertexes of a PartitionedGraph, created when first indexed. Iterating
+    gives only the vertexes created so far, the others have no state yet.
+    """
+    def __init__(self, graph, size):
+        super(LazyVertexes, self).__init__()
+        self.graph = graph
+        self.size = size
+        self.created = {}
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += self.size
+
+        if not 0 <= idx < self.size:
+            raise IndexError('Vertex {} not in the graph'.format(idx))
+
+        vertex = self.created.get(idx)
+        if vertex is None:
+            vertex = self.created[idx] = LazyVertex(self.graph, idx)
+
+        return vertex
+
+    def __iter__(self):
+        return iter(list(self.created.values()))
+
+
+class PartitionedGraph(Graph):
+    """
+    A read only Graph over a file in the partitioned format, with the blocks
+    loaded on demand and kept in an LRU cache of cache_blocks blocks. It can be
+    used as a context manager to close the file when done.
+    """
+    class ReadOnlyError(TypeError):
+        """PartitionedGraph edges can't be changed"""
+        pass
+
+    def __init__(self, filename, cache_blocks=64):
+        super(PartitionedGraph, self).__init__()
+        self.filename = filename
+        self.cache_blocks = cache_blocks
+        self.cache = OrderedDict()
+        self.partitioned = open(filename, 'rb')
+
+        header = self.partitioned.read(HEADER.size)
+        if len(header) < HEADER.size or not header.startswith(PARTITION_MAGIC):
+            self.partitioned.close()
+            raise ValueError('Not a partitioned graph file: {}'.format(filename))
+
+        (_, size, self.edge_count, self.block_size,
+         float_weights, self.digraph) = HEADER.unpack(header)
+
+        self.weights_typecode = 'd' if float_weights else 'q'
+        self.index = _read_array('q', self.partitioned,
+                                 -(-size // self.block_size) + 1)
+        self.vertexes = LazyVertexes(self, size)
+
+    def __repr__(self):
+        return (
+            'PartitionedGraph(vertexes={}, '
+            'edges={}, '
+            'cached_blocks={})'
+        ).format(len(self), self.edge_count, len(self.cache))
+
+    def __len__(self):
+        return len(self.vertexes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the underlying file"""
+        self.partitioned.close()
+
+    def release(self):
+        """
+        Drop every vertex created so far with its search state, to keep the
+        memory capped between queries. Vertexes taken before stay usable but
+        are not part of the graph anymore.
+        """
+        self.vertexes = LazyVertexes(self, len(self))
+
+    def to_compact(self):
+        """
+        Read every block into a CompactGraph, bypassing the block cache so it
+        keeps only the blocks of the current queries.
+        """
+        offsets = array('l', [0])
+        targets = array('l')
+        weights = array('d' if self.weights_typecode == 'd' else 'l')
+
+        self.partitioned.seek(self.index[0])
+        for block in range(len(self.index) - 1):
+            first = block * self.block_size
+            rows = min(len(self), first + self.block_size) - first
+
+            block_offsets = _read_array('q', self.partitioned, rows + 1)
+            block_targets = _read_array('q', self.partitioned,
+                                        block_offsets[-1])
+            block_weights = _read_array(self.weights_typecode,
+                                        self.partitioned, block_offsets[-1])
+
+            base = len(targets)
+            offsets.extend(base + offset for offset in block_offsets[1:])
+            # the file arrays are fixed at 8 bytes, the compact ones native
+            targets.fromlist(block_targets.tolist())
+            weights.fromlist(block_weights.tolist())
+
+        return CompactGraph(offsets, targets, weights, digraph=self.digraph)
+
+    def block(self, block):
+        """
+        Get the (offsets, targets, weights) arrays of a block, reading it from
+        disk if it's not in the cache and evicting the least recently used.
+        """
+        cached = self.cache.get(block)
+        if cached is not None:
+            self.cache.move_to_end(block)
+            return cached
+
+        first = block * self.block_size
+        rows = min(len(self), first + self.block_size) - first
+
+        self.partitioned.seek(self.index[block])
+        offsets = _read_array('q', self.partitioned, rows + 1)
+        targets = _read_array('q', self.partitioned, offsets[-1])
+        weights = _read_array(self.weights_typecode, self.partitioned,
+                              offsets[-1])
+
+        cached = self.cache[block] = (offsets, targets, weights)
+        if len(self.cache) > self.cache_blocks:
+            self.cache.popitem(last=False)
+
+        return cached
+
+    def degree(self, v):
+        """Number of edges leaving v"""
+        offsets, _, _ = self.block(v // self.block_size)
+        row = v % self.block_size
+        return offsets[row + 1] - offsets[row]
+
+    def neighboors(self, v):
+        """Give the array slice with the vertexes reached from v"""
+        offsets, targets, _ = self.block(v // self.block_size)
+        row = v % self.block_size
+        return targets[offsets[row]:offsets[row + 1]]
+
+    def edges(self, v):
+        """Give (neighboor, weight) pairs for the edges leaving v"""
+        offsets, targets, weights = self.block(v // self.block_size)
+        row = v % self.block_size
+        start = offsets[row]
+        end = offsets[row + 1]
+        return zip(targets[start:end], weights[start:end])
+
+    def add_edge(self, v_from, v_to, distance):
+        raise self.ReadOnlyError('PartitionedGraph is read only')
+
+    def remove_edge(self, v_from, v_to):
+        raise self.ReadOnlyError('PartitionedGraph is read only')
+
+    def update_edge(self, v_from, v_to, distance):
+        raise self.ReadOnlyError('PartitionedGraph is read only')
@@ -0,0 +1,108 @@
+# -*- encoding: utf-8 -*-
+"""
+Minimum spanning trees over undirected graphs, with Prim's and Kruskal's
+algorithms running on the compact graph representation.
+
+Both take a CompactGraph or a graph.Graph, and give the tree edges as
+(from, to, weight) tuples of vertex indexes. Disconnected graphs get a
+minimum spanning forest, one tree per connected component.
+
+:author: Andre Filliettaz
+:email: andrentaz@gmail.com
+:github: https://github.com/andrentaz
+"""
+from __future__ import absolute_import, unicode_literals
+
+from array import array
+
+from compact import UNREACHED, as_compact
+from helpers import IndexedMinHeap, UnionFind
+
+
+def _undirected(graph):
+    graph = as_compact(graph)
+    if graph.digraph:
+        raise ValueError('Spanning trees are only defined for undirected graphs')
+
+    return graph
+
+
+def prim(graph):
+    """
+    Run Prim's algorithm, growing each tree from its lowest vertex and always
+    taking the lightest edge leaving it, kept in an IndexedMinHeap keyed by
+    vertex.
+
+    :param graph: undirected CompactGraph or graph.Graph
+    :return: list with the (from, to, weight) tree edges
+    """
+    graph = _undirected(graph)
+    size = len(graph)
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    in_tree = bytearray(size)
+    parents = array('l', [UNREACHED]) * size
+    lightest = array(weights.typecode, [0]) * size
+    vertex_heap = IndexedMinHeap(size)
+    tree = []
+
+    for root in range(size):
+        if in_tree[root]:
+            continue
+
+        vertex_heap.push(root, 0)
+        while vertex_heap:
+            node, _ = vertex_heap.extract_min()
+            in_tree[node] = 1
+            if parents[node] != UNREACHED:
+                tree.append((parents[node], node, lightest[node]))
+
+            for idx in range(offsets[node], offsets[node + 1]):
+                neighboor = targets[idx]
+                weight = weights[idx]
+                if in_tree[neighboor]:
+                    continue
+
+                if neighboor not in vertex_heap or weight < lightest[neighboor]:
+                    parents[neighboor] = node
+                    lightest[neighboor] = weight
+                    vertex_heap.push(neighboor, weight)
+
+    return tree
+
+
+def kruskal(graph):
+    """
+    Run Kruskal's algorithm, taking the edges sorted by weight and keeping the
+    ones joining two different trees of a UnionFind.
+
+    :param graph: undirected CompactGraph or graph.Graph
+    :return: list with the (from, to, weight) tree edges
+    """
+    graph = _undirected(graph)
+    size = len(graph)
+
+    # every undirected edge is stored both ways, keep the one going up
+    sources = array('l')
+    targets = array('l')
+    weights = array(graph.weights.typecode)
+    for v_from in range(size):
+        for v_to, weight in graph.edges(v_from):
+            if v_from < v_to:
+                sources.append(v_from)
+                targets.append(v_to)
+                weights.append(weight)
+
+    order = sorted(range(len(weights)), key=weights.__getitem__)
+    sets = UnionFind(size)
+    tree = []
+
+    for idx in order:
+        if sets.union(sources[idx], targets[idx]):
+            tree.append((sources[idx], targets[idx], weights[idx]))
+            if len(tree) == size - 1:
+                break
+
+    return tree
@@ -0,0 +1,305 @@
+# -*- encoding: utf-8 -*-
+"""
+Build compact graphs from streams of edges, without knowing the number of
+vertexes in advance nor having the whole input at hand.
+
+The input can be a path, '-' for stdin, a file-like object or any iterable of
+'from to weight' lines or (from, to, weight) tuples, and gzip compressed input
+is detected by its magic bytes. A single number line, like the first line of
+the files read by Graph.create_from_file, is taken as the vertex count.
+
+:author: Andre Filliettaz
+:email: andrentaz@gmail.com
+:github: https://github.com/andrentaz
+"""
+from __future__ import absolute_import, unicode_literals
+
+import gzip
+import io
+import sys
+from array import array
+
+from compact import CompactGraph
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+class _RawReader(io.RawIOBase):
+    """Adapt a binary file-like object with a read method to RawIOBase"""
+    def __init__(self, stream):
+        super(_RawReader, self).__init__()
+        self.stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def read_lines(source):
+    """
+    Iterate over the text lines of a path, '-' for stdin or a file-like
+    object, decompressing gzip input on the fly.
+
+    :param source: where the lines come from
+    """
+    opened = None
+    if source == '-':
+        stream = sys.stdin.buffer
+    elif isinstance(source, str):
+        stream = opened = open(source, 'rb')
+    else:
+        stream = source
+
+    try:
+        # binary streams are buffered so the magic is checked without
+        # consuming it, a read of 0 tells them apart from text ones
+        if (not hasattr(stream, 'peek') and hasattr(stream, 'read')
+                and isinstance(stream.read(0), bytes)):
+            stream = io.BufferedReader(_RawReader(stream))
+
+        if hasattr(stream, 'peek') and stream.peek(2)[:2] == GZIP_MAGIC:
+            stream = gzip.GzipFile(fileobj=stream)
+
+        for line in stream:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+
+            yield line
+    finally:
+        # a GzipFile doesn't close the file it was given, so close both
+        if opened is not None:
+            stream.close()
+            opened.close()
+
+
+def _parse_weight(token):
+    """Weights are integers unless they can't be"""
+    try:
+        return int(token)
+    except ValueError:
+        return float(token)
+
+
+def _merge_rows(size, edges, mirrored):
+    """
+    Lay the edges out in rows by source with a counting sort and merge the
+    parallel edges of each row in place, keeping the lightest.
+
+    :param edges: list with the sources, targets and weights arrays, emptied
+                  so the arrays are dropped as soon as they are sorted
+    :param mirrored: if each edge also goes from its target to its source
+    :return: tuple with the offsets, targets and weights of the rows
+    """
+    sources, targets, weights = edges
+    del edges[:]
+
+    # count the edges of each source to lay the rows out
+    offsets = array('l', [0]) * (size + 1)
+    for idx, v_from in enumerate(sources):
+        offsets[v_from + 1] += 1
+        if mirrored and targets[idx] != v_from:
+            offsets[targets[idx] + 1] += 1
+
+    for v in range(size):
+        offsets[v + 1] += offsets[v]
+
+    cursor = array('l', offsets[:-1])
+    row_targets = array('l', [0]) * offsets[size]
+    row_weights = array(weights.typecode, [0]) * offsets[size]
+    for idx, v_from in enumerate(sources):
+        v_to = targets[idx]
+        row_targets[cursor[v_from]] = v_to
+        row_weights[cursor[v_from]] = weights[idx]
+        cursor[v_from] += 1
+
+        if mirrored and v_to != v_from:
+            row_targets[cursor[v_to]] = v_from
+            row_weights[cursor[v_to]] = weights[idx]
+            cursor[v_to] += 1
+
+    del sources, targets, weights, cursor
+
+    write = 0
+    row_start = 0
+    for v in range(size):
+        row_end = offsets[v + 1]
+        lightest = {}
+        for idx in range(row_start, row_end):
+            v_to = row_targets[idx]
+            weight = row_weights[idx]
+            if v_to not in lightest or weight < lightest[v_to]:
+                lightest[v_to] = weight
+
+        for v_to in sorted(lightest):
+            row_targets[write] = v_to
+            row_weights[write] = lightest[v_to]
+            write += 1
+
+        row_start = row_end
+        offsets[v + 1] = write
+
+    del row_targets[write:]
+    del row_weights[write:]
+
+    return offsets, row_targets, row_weights
+
+
+class GraphBuilder(object):
+    """
+    Collect edges one at a time in flat arrays that grow on demand, and turn
+    them into a CompactGraph at the end.
+
+    Parallel edges are reduced to the one with the minimum weight. Once the
+    buffer reaches fold_size edges, or twice the distinct edges left by the
+    last fold, it is folded so the duplicates are merged while reading. The
+    memory then grows with the distinct edges and not with the raw input.
+    Undirected edges are kept once, from the lower vertex, and mirrored only
+    when finalizing.
+    """
+    def __init__(self, digraph=False, fold_size=1 << 20):
+        super(GraphBuilder, self).__init__()
+        self.digraph = digraph
+        self.fold_size = fold_size
+        self.fold_at = fold_size
+        self.size = 0
+        self.sources = array('l')
+        self.targets = array('l')
+        self.weights = array('l')
+
+    def __repr__(self):
+        return (
+            'GraphBuilder(vertexes={}, '
+            'edges={}, '
+            'digraph={})'
+        ).format(self.size, len(self.sources), self.digraph)
+
+    def reserve(self, size):
+        """Make sure the graph has at least size vertexes"""
+        self.size = max(self.size, size)
+
+    def add_edge(self, v_from, v_to, weight):
+        """Add an edge between vertex indexes, growing the vertexes if needed"""
+        if v_from < 0 or v_to < 0:
+            raise IndexError(
+                'Negative vertex index in edge ({}, {})'.format(v_from, v_to)
+            )
+
+        # a non integer weight turns every weight into a float
+        if self.weights.typecode == 'l' and not isinstance(weight, int):
+            self.weights = array('d', self.weights)
+
+        # both ways of an undirected edge must land in the same row to merge
+        if not self.digraph and v_to < v_from:
+            v_from, v_to = v_to, v_from
+
+        self.sources.append(v_from)
+        self.targets.append(v_to)
+        self.weights.append(weight)
+        self.size = max(self.size, v_to + 1, v_from + 1)
+
+        if len(self.sources) >= self.fold_at:
+            self.fold()
+
+    def consume(self, edges):
+        """
+        Add every edge from an iterable of 'from to weight' lines or
+        (from, to, weight) tuples. Blank lines are skipped and single number
+        lines are taken as the vertex count, which the edges after them must
+        respect.
+
+        :raises ValueError: naming the first line that can't be read
+        """
+        declared = None
+        for number, edge in enumerate(edges, 1):
+            if not isinstance(edge, str):
+                self.add_edge(*edge)
+                continue
+
+            tokens = edge.split()
+            if not tokens:
+                continue
+
+            try:
+                if len(tokens) == 1:
+                    declared = int(tokens[0])
+                    self.reserve(declared)
+                    continue
+
+                if len(tokens) != 3:
+                    raise ValueError()
+
+                v_from = int(tokens[0])
+                v_to = int(tokens[1])
+                weight = _parse_weight(tokens[2])
+            except ValueError:
+                raise ValueError(
+                    "Line {}: expected 'from to weight', got '{}'"
+                    .format(number, edge.strip())
+                )
+
+            bound = declared if declared is not None else float('inf')
+            if not (0 <= v_from < bound and 0 <= v_to < bound):
+                raise ValueError(
+                    'Line {}: edge between non existing vertexes: {}'
+                    .format(number, edge.strip())
+                )
+
+            self.add_edge(v_from, v_to, weight)
+
+    def fold(self):
+        """Merge the parallel edges collected so far, keeping the lightest"""
+        edges = [self.sources, self.targets, self.weights]
+        self.sources = self.targets = self.weights = None
+
+        offsets, targets, weights = _merge_rows(self.size, edges,
+                                                mirrored=False)
+
+        # back to one entry per edge, so new edges can be appended
+        self.sources = array('l')
+        for v in range(self.size):
+            self.sources.extend(array('l', [v]) * (offsets[v + 1] - offsets[v]))
+
+        self.targets = targets
+        self.weights = weights
+        self.fold_at = max(self.fold_size, 2 * len(self.sources))
+
+    def finalize(self):
+        """
+        Create the CompactGraph with the edges collected so far. The edge
+        arrays are released as soon as they are sorted by source, so the peak
+        memory is the buffer plus the final graph.
+
+        :return: CompactGraph with the parallel edges merged
+        """
+        edges = [self.sources, self.targets, self.weights]
+        self.sources = array('l')
+        self.targets = array('l')
+        self.weights = array(edges[2].typecode)
+
+        offsets, targets, weights = _merge_rows(self.size, edges,
+                                                mirrored=not self.digraph)
+
+        graph = CompactGraph(offsets, targets, weights, digraph=self.digraph)
+        self.size = 0
+        self.fold_at = self.fold_size
+        return graph
+
+
+def build_from_stream(source, digraph=False):
+    """
+    Create a CompactGraph from a stream of edges.
+
+    :param source: path, '-' for stdin, file-like object or iterable of edges
+    :param digraph: if the edges only go from the first to the second vertex
+    """
+    builder = GraphBuilder(digraph=digraph)
+
+    if isinstance(source, str) or hasattr(source, 'read'):
+        source = read_lines(source)
+
+    builder.consume(source)
+    return builder.finalize()
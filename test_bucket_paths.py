@@ -0,0 +1,59 @@
+# -*- encoding: utf-8 -*-
+"""
+Randomized checks of the bucket based shortest paths from the compact module
+against the heap based compact.dijkstra.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import random
+
+from compact import (
+    UNREACHED, CompactGraph, delta_stepping, dial, dijkstra, path_to,
+)
+from graph import Graph, Vertex
+
+
+def random_compact(rand):
+    """Create a random CompactGraph with small integer weights, zero included"""
+    graph = Graph()
+    graph.digraph = rand.random() < 0.5
+    graph.vertexes = [Vertex(str(i)) for i in range(rand.randint(1, 40))]
+    max_weight = rand.choice([1, 3, 50])
+
+    for _ in range(rand.randint(0, 120)):
+        graph.add_edge(rand.choice(graph.vertexes), rand.choice(graph.vertexes),
+                       rand.randint(0, max_weight))
+
+    return CompactGraph.from_graph(graph)
+
+
+def check_paths(graph, distances, parents):
+    """Every path must be made of edges adding up to the distance found"""
+    for end in range(len(graph)):
+        path = path_to(parents, 0, end)
+        if distances[end] == UNREACHED:
+            assert path == []
+            continue
+
+        total = 0
+        for v_from, v_to in zip(path, path[1:]):
+            total += min(w for t, w in graph.edges(v_from) if t == v_to)
+
+        assert path[0] == 0 and path[-1] == end
+        assert total == distances[end]
+
+
+def test_bucket_searches_match_dijkstra():
+    rand = random.Random(29)
+
+    for _ in range(300):
+        graph = random_compact(rand)
+        expected, _ = dijkstra(graph, 0)
+
+        for distances, parents in (
+                dial(graph, 0),
+                delta_stepping(graph, 0),
+                delta_stepping(graph, 0, delta=rand.randint(1, 10)),
+        ):
+            assert list(distances) == list(expected)
+            check_paths(graph, distances, parents)
@@ -0,0 +1,92 @@
+# -*- encoding: utf-8 -*-
+"""
+Randomized checks of the dynamic shortest path tree kept by
+Graph.track_shortest_paths against a fresh dijkstra after every update.
+"""
+from __future__ import absolute_import, unicode_literals
+
+import random
+
+import pytest
+
+from graph import Edge, Graph, Vertex
+
+
+def fresh_distances(graph, start):
+    """Copy the graph and run dijkstra on the copy from scratch"""
+    copy = Graph()
+    copy.digraph = graph.digraph
+    copy.vertexes = [Vertex(v.label) for v in graph.vertexes]
+    indexes = {vertex: idx for idx, vertex in enumerate(graph.vertexes)}
+
+    for idx, vertex in enumerate(graph.vertexes):
+        for edge in vertex.edges:
+            copy.vertexes[idx].edges.append(Edge(
+                copy.vertexes[idx],
+                copy.vertexes[indexes[edge.neighboor]],
+                edge.distance,
+            ))
+
+    copy.dijkstra(copy.vertexes[indexes[start]])
+    return [v.distance for v in copy.vertexes]
+
+
+def check_tree(graph):
+    """Every previous node must reach its vertex with an edge on the path"""
+    for vertex in graph.vertexes:
+        if vertex.previous is None:
+            continue
+
+        assert any(
+            e.neighboor is vertex
+            and vertex.previous.distance + e.distance == vertex.distance
+            for e in vertex.previous.edges
+        )
+
+
+def random_update(graph, rand):
+    """Add, remove or reweight a random edge, parallel and self-loops too"""
+    vertexes = graph.vertexes
+    edges = [(v, e.neighboor) for v in vertexes for e in v.edges]
+    operation = rand.random()
+
+    if operation < 0.4 or not edges:
+        graph.add_edge(rand.choice(vertexes), rand.choice(vertexes),
+                       rand.randint(0, 9))
+    elif operation < 0.7:
+        graph.remove_edge(*rand.choice(edges))
+    else:
+        graph.update_edge(*rand.choice(edges), distance=rand.randint(0, 9))
+
+
+def test_dynamic_tree_matches_fresh_dijkstra():
+    rand = random.Random(26)
+
+    for _ in range(400):
+        graph = Graph()
+        graph.digraph = rand.random() < 0.5
+        graph.vertexes = [Vertex(str(i)) for i in range(rand.randint(1, 10))]
+        for _ in range(rand.randint(0, 20)):
+            random_update(graph, rand)
+
+        start = graph.vertexes[0]
+        graph.track_shortest_paths(start)
+
+        for _ in range(30):
+            random_update(graph, rand)
+            assert ([v.distance for v in graph.vertexes]
+                    == fresh_distances(graph, start))
+            check_tree(graph)
+
+
+def test_remove_missing_edge_leaves_graph_unchanged():
+    graph = Graph()
+    graph.vertexes = [Vertex(str(i)) for i in range(3)]
+    graph.add_edge(graph.vertexes[0], graph.vertexes[1], 1)
+    graph.track_shortest_paths(graph.vertexes[0])
+
+    with pytest.raises(ValueError):
+        graph.remove_edge(graph.vertexes[0], graph.vertexes[2])
+
+    assert len(graph.vertexes[0].edges) == 1
+    assert len(graph.incoming[graph.vertexes[1]]) == 1
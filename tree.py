@@ -3,6 +3,7 @@
 
 class Tree(object):
     """An abstraction of Tree data structure"""
+    __slots__ = ('key', 'left', 'right', 'parent')
 
     class DuplicatedKeyError(Exception):
         """Trees don't allow duplicated keys"""